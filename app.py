@@ -1,11 +1,12 @@
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 import streamlit as st
 
 # Add the project root to the path
 sys.path.append(os.path.abspath(os.path.dirname(__file__)))
 
-from core.database import init_database, db_manager
+from core.database import init_database
 from navigation import create_navigation
 
 # Page configuration
@@ -20,26 +21,29 @@ st.set_page_config(
 create_navigation()
 
 
+# Start database initialization in the background so the page can render meanwhile
+@st.cache_resource
+def start_database_initialization():
+    """Submit init_database to a worker thread - cached so it runs once per process"""
+    executor = ThreadPoolExecutor(max_workers=1)
+    future = executor.submit(init_database)
+    executor.shutdown(wait=False)
+    return future
+
 # Initialize database on app startup
 @st.cache_resource
 def initialize_database():
-    """Initialize database connection - cached to avoid repeated calls"""
+    """Wait for the background database initialization - cached to avoid repeated calls"""
     try:
-        if init_database():
+        if start_database_initialization().result():
             return {"status": "success", "message": "Database initialized successfully"}
         else:
             return {"status": "error", "message": "Failed to initialize database"}
     except Exception as e:
         return {"status": "error", "message": f"Database error: {e}"}
 
-# Initialize database
-db_status = initialize_database()
-
-# Display database status
-if db_status["status"] == "success":
-    st.sidebar.success("✅ Database Ready")
-else:
-    st.sidebar.error(f"❌ Database Issue: {db_status['message']}")
+# Kick off database initialization
+start_database_initialization()
 
 # Main page content
 st.title("Q-P Plot Digitizer")
@@ -60,4 +64,13 @@ st.markdown("""
 ---
 ### About
 This tool helps researchers extract numerical data from Q-P plots in scientific publications and download digitised data.
-""")
\ No newline at end of file
+""")
+
+# Initialize database (waits for the background thread if still running)
+db_status = initialize_database()
+
+# Display database status
+if db_status["status"] == "success":
+    st.sidebar.success("✅ Database Ready")
+else:
+    st.sidebar.error(f"❌ Database Issue: {db_status['message']}")
@@ -1,18 +1,81 @@
 import streamlit as st
+import numpy as np
 from PIL import Image
 from core.streamlit_drawing import get_click_coordinates_simple
 
+# Session state slot holding the downscaled calibration image and its scales
+CALIBRATION_IMAGE_STATE_KEY = "calibration_display_image"
+
+# Longest side (in pixels) of the image shown on the calibration canvas
+MAX_CALIBRATION_SIDE = 1200
+
+def downscale_for_calibration(image_pil, max_side=MAX_CALIBRATION_SIDE):
+    """
+    Downscale large images so the calibration canvas stays cheap to re-render
+    
+    The result is kept in session state and reused while the same image object
+    is passed in, so reruns skip the copy and resize and the canvas overlay
+    cache sees the same display image every time.
+    
+    Args:
+        image_pil: PIL Image object
+        max_side: Maximum length of the longest side of the displayed image
+        
+    Returns:
+        tuple: (display_image, x_scale, y_scale) where the scales map display pixels back to original pixels
+    """
+    cached = st.session_state.get(CALIBRATION_IMAGE_STATE_KEY)
+    if cached is not None and cached[0] is image_pil and cached[1] == max_side:
+        return cached[2]
+    
+    if max(image_pil.size) <= max_side:
+        result = (image_pil, 1.0, 1.0)
+    else:
+        display_image = image_pil.copy()
+        display_image.thumbnail((max_side, max_side), Image.BILINEAR)
+        result = (display_image, image_pil.width / display_image.width, image_pil.height / display_image.height)
+    
+    st.session_state[CALIBRATION_IMAGE_STATE_KEY] = (image_pil, max_side, result)
+    return result
+
+def get_axis_points(image_pil, instructions, key):
+    """
+    Collect 2 calibration points for one axis
+    
+    Once both points are captured the canvas is no longer rendered, so later
+    reruns don't re-encode the image for the click component.
+    
+    Args:
+        image_pil: PIL Image object shown on the canvas
+        instructions: Instructions to show user
+        key: Unique key for the component
+        
+    Returns:
+        list: List of (x, y) coordinate tuples in displayed-image pixels
+    """
+    points_key = f"{key}_points"
+    stored_points = st.session_state.get(points_key, [])
+    
+    if len(stored_points) < 2:
+        return get_click_coordinates_simple(image_pil, instructions, key=key, max_points=2)
+    
+    if st.button("🔄 Reselect Points", key=f"{key}_reselect"):
+        st.session_state[points_key] = []
+        st.session_state[f"{key}_reset_counter"] = st.session_state.get(f"{key}_reset_counter", 0) + 1
+        st.rerun()
+    
+    return stored_points
+
 def calibrate_axes_streamlit(image_pil):
+    # Clicks are captured on a downscaled copy and mapped back to original pixels
+    display_image, scale_x, scale_y = downscale_for_calibration(image_pil)
+    
     st.write("### X-Axis Calibration")
     st.write("Click 2 points along the X-axis (left to right)")
     
     # X-axis points (automatically proceed after 2 points)
-    x_points = get_click_coordinates_simple(
-        image_pil, 
-        "Click 2 points along the X-axis", 
-        key="x_axis_calib",
-        max_points=2
-    )
+    x_points = get_axis_points(display_image, "Click 2 points along the X-axis", key="x_axis_calib")
+    x_points = [(x * scale_x, y * scale_y) for x, y in x_points]
     
     if len(x_points) >= 2:
         x1_pixel, y1_pixel = x_points[0]
@@ -20,90 +83,82 @@ def calibrate_axes_streamlit(image_pil):
         
         st.write(f"X-axis points selected: ({x1_pixel:.1f}, {y1_pixel:.1f}) and ({x2_pixel:.1f}, {y2_pixel:.1f})")
         
-        col1, col2 = st.columns(2)
-        with col1:
-            x1_data = st.number_input("Enter actual X-axis value for first point", key="x1_data")
-        with col2:
-            x2_data = st.number_input("Enter actual X-axis value for second point", key="x2_data")
+        st.write("### Y-Axis Calibration")
+        st.write("Click 2 points along the Y-axis (bottom to top)")
+        
+        # Y-axis points (automatically proceed after 2 points)
+        y_points = get_axis_points(display_image, "Click 2 points along the Y-axis", key="y_axis_calib")
+        y_points = [(x * scale_x, y * scale_y) for x, y in y_points]
         
-        if x1_data != x2_data:  # Ensure we have different values
-            st.write("### Y-Axis Calibration")
-            st.write("Click 2 points along the Y-axis (bottom to top)")
+        if len(y_points) >= 2:
+            x3_pixel, y3_pixel = y_points[0]
+            x4_pixel, y4_pixel = y_points[1]
             
-            # Y-axis points (automatically proceed after 2 points)
-            y_points = get_click_coordinates_simple(
-                image_pil, 
-                "Click 2 points along the Y-axis", 
-                key="y_axis_calib",
-                max_points=2
-            )
+            st.write(f"Y-axis points selected: ({x3_pixel:.1f}, {y3_pixel:.1f}) and ({x4_pixel:.1f}, {y4_pixel:.1f})")
             
-            if len(y_points) >= 2:
-                x3_pixel, y3_pixel = y_points[0]
-                x4_pixel, y4_pixel = y_points[1]
-                
-                st.write(f"Y-axis points selected: ({x3_pixel:.1f}, {y3_pixel:.1f}) and ({x4_pixel:.1f}, {y4_pixel:.1f})")
-                
-                col3, col4 = st.columns(2)
-                with col3:
+            # Axis values in one form so editing them triggers a single rerun on submit
+            with st.form("axis_values"):
+                col1, col2 = st.columns(2)
+                with col1:
+                    x1_data = st.number_input("Enter actual X-axis value for first point", key="x1_data")
                     y1_data = st.number_input("Enter actual Y-axis value for first point", key="y1_data")
-                with col4:
+                with col2:
+                    x2_data = st.number_input("Enter actual X-axis value for second point", key="x2_data")
                     y2_data = st.number_input("Enter actual Y-axis value for second point", key="y2_data")
+                st.form_submit_button("Apply Axis Values")
+            
+            if x1_data == x2_data:  # Ensure we have different values
+                st.warning("Please enter different X-axis values")
+            elif y1_data != y2_data:  # Ensure we have different values
+                # Check if pixel coordinates are valid for calibration
+                x_pixel_diff = x2_pixel - x1_pixel
+                y_pixel_diff = y4_pixel - y3_pixel
                 
-                if y1_data != y2_data:  # Ensure we have different values
-                    # Check if pixel coordinates are valid for calibration
-                    x_pixel_diff = x2_pixel - x1_pixel
-                    y_pixel_diff = y4_pixel - y3_pixel
+                if abs(x_pixel_diff) < 5:  # X points too close together
+                    st.error("❌ X-axis calibration points are too close together or identical. Please select two points that are further apart horizontally.")
+                    st.write(f"Point 1: ({x1_pixel:.1f}, {y1_pixel:.1f})")
+                    st.write(f"Point 2: ({x2_pixel:.1f}, {y2_pixel:.1f})")
+                    st.write(f"Horizontal distance: {abs(x_pixel_diff):.1f} pixels (minimum: 5 pixels)")
                     
-                    if abs(x_pixel_diff) < 5:  # X points too close together
-                        st.error("❌ X-axis calibration points are too close together or identical. Please select two points that are further apart horizontally.")
-                        st.write(f"Point 1: ({x1_pixel:.1f}, {y1_pixel:.1f})")
-                        st.write(f"Point 2: ({x2_pixel:.1f}, {y2_pixel:.1f})")
-                        st.write(f"Horizontal distance: {abs(x_pixel_diff):.1f} pixels (minimum: 5 pixels)")
-                        
-                        # Add button to reset X-axis calibration
-                        if st.button("🔄 Reset X-axis Calibration", key="reset_x_calibration"):
-                            if "x_axis_calib_points" in st.session_state:
-                                del st.session_state["x_axis_calib_points"]
-                            st.rerun()
-                        return None
-                        
-                    elif abs(y_pixel_diff) < 5:  # Y points too close together
-                        st.error("❌ Y-axis calibration points are too close together or identical. Please select two points that are further apart vertically.")
-                        st.write(f"Point 1: ({x3_pixel:.1f}, {y3_pixel:.1f})")
-                        st.write(f"Point 2: ({x4_pixel:.1f}, {y4_pixel:.1f})")
-                        st.write(f"Vertical distance: {abs(y_pixel_diff):.1f} pixels (minimum: 5 pixels)")
-                        
-                        # Add button to reset Y-axis calibration
-                        if st.button("🔄 Reset Y-axis Calibration", key="reset_y_calibration"):
-                            if "y_axis_calib_points" in st.session_state:
-                                del st.session_state["y_axis_calib_points"]
-                            st.rerun()
-                        return None
+                    # Add button to reset X-axis calibration
+                    if st.button("🔄 Reset X-axis Calibration", key="reset_x_calibration"):
+                        if "x_axis_calib_points" in st.session_state:
+                            del st.session_state["x_axis_calib_points"]
+                        st.rerun()
+                    return None
                     
-                    else:
-                        # Create transformation function with error handling
-                        def pixel_to_data(x_pixel, y_pixel):
-                            try:
-                                # Linear interpolation for X
-                                x_data = x1_data + (x_pixel - x1_pixel) * (x2_data - x1_data) / (x2_pixel - x1_pixel)
-                                # Linear interpolation for Y
-                                y_data = y1_data + (y_pixel - y3_pixel) * (y2_data - y1_data) / (y4_pixel - y3_pixel)
-                                return x_data, y_data
-                            except ZeroDivisionError:
-                                st.error("❌ Calibration error: Division by zero. Please recalibrate your axes.")
-                                return 0, 0
-                        
-                        st.success("✅ Axes calibration complete!")
-                        
-                        
-                        return pixel_to_data
+                elif abs(y_pixel_diff) < 5:  # Y points too close together
+                    st.error("❌ Y-axis calibration points are too close together or identical. Please select two points that are further apart vertically.")
+                    st.write(f"Point 1: ({x3_pixel:.1f}, {y3_pixel:.1f})")
+                    st.write(f"Point 2: ({x4_pixel:.1f}, {y4_pixel:.1f})")
+                    st.write(f"Vertical distance: {abs(y_pixel_diff):.1f} pixels (minimum: 5 pixels)")
+                    
+                    # Add button to reset Y-axis calibration
+                    if st.button("🔄 Reset Y-axis Calibration", key="reset_y_calibration"):
+                        if "y_axis_calib_points" in st.session_state:
+                            del st.session_state["y_axis_calib_points"]
+                        st.rerun()
+                    return None
+                
                 else:
-                    st.warning("Please enter different Y-axis values")
+                    # Precompute the linear mapping once (pixel distances checked above)
+                    x_scale = (x2_data - x1_data) / x_pixel_diff
+                    y_scale = (y2_data - y1_data) / y_pixel_diff
+                    scale = np.array([x_scale, y_scale], dtype=np.float64)
+                    offset = np.array([x1_data - x1_pixel * x_scale, y1_data - y3_pixel * y_scale], dtype=np.float64)
+                    
+                    # Create transformation function - maps an (x, y) pair or an (N, 2) array of pixels
+                    def pixel_to_data(pixel_points):
+                        return np.asarray(pixel_points, dtype=np.float64) * scale + offset
+                    
+                    st.success("✅ Axes calibration complete!")
+                    
+                    
+                    return pixel_to_data
             else:
-                st.info("Please click 2 points on the Y-axis")
+                st.warning("Please enter different Y-axis values")
         else:
-            st.warning("Please enter different X-axis values")
+            st.info("Please click 2 points on the Y-axis")
     else:
         st.info("Please click 2 points on the X-axis")
     
@@ -1,41 +1,192 @@
 import psycopg2
+import psycopg2.extensions
 import psycopg2.extras
+import psycopg2.pool
+import io
 import os
-from datetime import datetime
-from typing import List, Dict, Optional, Tuple
+import threading
+from contextlib import contextmanager
+from itertools import groupby
+from operator import itemgetter
+from typing import Iterator, List, Dict, Optional, Tuple
 import logging
 from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
-
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Plot identifier cleanup: DOI prefixes to strip and character translation tables
+_DOI_PREFIXES = ('https://doi.org/', 'http://doi.org/', 'doi:')
+_DOI_TRANS = str.maketrans({'/': '_', '.': '_'})
+_FIGURE_TRANS = str.maketrans({' ': '_', '.': '_'})
+
+# SQL for the hot paths, built once at import. Statements run through
+# execute_prepared use $n placeholders; the rest use psycopg2's %s.
+_SQL_CHECK_PLOT = "SELECT EXISTS (SELECT 1 FROM plots WHERE doi = $1 AND figure_number = $2) AS exists"
+
+_SQL_INSERT_PLOT = """
+    INSERT INTO plots (doi, figure_number, plot_identifier, x_axis_range, y_axis_range)
+    VALUES ($1, $2, $3, $4, $5)
+    ON CONFLICT (doi, figure_number) DO NOTHING
+    RETURNING id
+"""
+
+_SQL_INSERT_SANDSTONES = "INSERT INTO sandstones (plot_id, sandstone_name) VALUES %s RETURNING id, sandstone_name"
+
+_SQL_COPY_DATA_POINTS = "COPY data_points (sandstone_id, x_pixel, y_pixel, p_mpa, q_mpa) FROM STDIN WITH (FORMAT text)"
+
+# Cheap fingerprint of the plots table - sandstones and points are only ever
+# written together with their plot, so this changes whenever the listing does
+_SQL_PLOTS_VERSION = "SELECT COUNT(*), MAX(id) FROM plots"
+
+_SQL_ALL_PLOTS = """
+    SELECT p.id, p.doi, p.figure_number, p.plot_identifier, p.x_axis_range, p.y_axis_range, 
+           p.created_at,
+           (SELECT COUNT(*) FROM sandstones s WHERE s.plot_id = p.id) AS sandstone_count,
+           (SELECT COUNT(*)
+              FROM sandstones s
+              JOIN data_points dp ON dp.sandstone_id = s.id
+             WHERE s.plot_id = p.id) AS total_points
+    FROM plots p
+    ORDER BY p.created_at DESC
+"""
+
+_SQL_PLOT_DATA = """
+    SELECT p.*, d.sandstone_name, d.x_pixel, d.y_pixel, d.p_mpa, d.q_mpa
+    FROM plots p
+    LEFT JOIN LATERAL (
+        SELECT array_agg(s.sandstone_name ORDER BY s.sandstone_name, dp.id) AS sandstone_name,
+               array_agg(dp.x_pixel ORDER BY s.sandstone_name, dp.id) AS x_pixel,
+               array_agg(dp.y_pixel ORDER BY s.sandstone_name, dp.id) AS y_pixel,
+               array_agg(dp.p_mpa ORDER BY s.sandstone_name, dp.id) AS p_mpa,
+               array_agg(dp.q_mpa ORDER BY s.sandstone_name, dp.id) AS q_mpa
+        FROM sandstones s
+        JOIN data_points dp ON s.id = dp.sandstone_id
+        WHERE s.plot_id = p.id
+    ) d ON TRUE
+    WHERE p.id = $1
+"""
+
+# Per-point columns returned column-wise by _SQL_PLOT_DATA
+_DATA_POINT_COLUMNS = ('sandstone_name', 'x_pixel', 'y_pixel', 'p_mpa', 'q_mpa')
+
+_SQL_ALL_DATA_POINTS = """
+    SELECT s.sandstone_name, dp.x_pixel, dp.y_pixel, dp.p_mpa, dp.q_mpa,
+           p.doi, p.figure_number, p.plot_identifier
+    FROM plots p
+    JOIN sandstones s ON p.id = s.plot_id
+    JOIN data_points dp ON s.id = dp.sandstone_id
+    ORDER BY p.created_at DESC, p.id, s.sandstone_name, dp.id
+"""
+
+_SQL_DELETE_PLOT = "DELETE FROM plots WHERE id = %s"
+
+_SQL_DATABASE_STATS = """
+    SELECT (SELECT COUNT(*) FROM plots) AS plots,
+           (SELECT COUNT(*) FROM sandstones) AS sandstones,
+           (SELECT COUNT(*) FROM data_points) AS data_points,
+           pg_size_pretty(pg_database_size(current_database())) AS database_size
+"""
+
+class PreparingConnection(psycopg2.extensions.connection):
+    """Connection that remembers which server-side prepared statements it holds"""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared = set()
+
 class DatabaseManager:
     def __init__(self):
         self.database_url = os.getenv('DATABASE_URL')
         if not self.database_url:
             raise Exception("DATABASE_URL not found in environment variables")
+        # Pool size, and how long a request waits for a free connection (seconds)
+        self.pool_max_connections = int(os.getenv('DB_POOL_MAX_CONNECTIONS', '10'))
+        self.pool_wait_timeout = float(os.getenv('DB_POOL_WAIT_TIMEOUT', '30'))
+        self.pool = None
+        self._pool_lock = threading.Lock()
+        # ThreadedConnectionPool raises instead of waiting when every connection
+        # is checked out, so callers queue on this semaphore first
+        self._pool_slots = threading.BoundedSemaphore(self.pool_max_connections)
+        # (version, plots) from the last get_all_plots listing
+        self._plots_cache = None
+    
+    def _get_pool(self):
+        """Create the thread-safe connection pool on first use"""
+        if self.pool is None:
+            with self._pool_lock:
+                if self.pool is None:
+                    # putconn closes any returned connection once minconn are idle, which
+                    # would throw away its PREPAREd statements - so keep every one open
+                    self.pool = psycopg2.pool.ThreadedConnectionPool(
+                        minconn=self.pool_max_connections,
+                        maxconn=self.pool_max_connections,
+                        dsn=self.database_url,
+                        connection_factory=PreparingConnection,
+                        cursor_factory=psycopg2.extras.RealDictCursor
+                    )
+        return self.pool
     
     def get_connection(self):
-        """Get a new database connection for thread safety"""
+        """Get a pooled database connection - hand it back with release_connection
+        
+        Waits up to pool_wait_timeout seconds for a connection when all of them
+        are in use.
+        """
+        if not self._pool_slots.acquire(timeout=self.pool_wait_timeout):
+            logger.error(f"Connection pool exhausted: all {self.pool_max_connections} connections "
+                         f"still in use after {self.pool_wait_timeout:g}s")
+            return None
         try:
-            connection = psycopg2.connect(
-                self.database_url,
-                cursor_factory=psycopg2.extras.RealDictCursor
-            )
-            return connection
+            return self._get_pool().getconn()
         except psycopg2.Error as e:
+            self._pool_slots.release()
             logger.error(f"Error connecting to PostgreSQL: {e}")
             return None
     
+    def release_connection(self, connection):
+        """Return a connection to the pool, discarding it if it has been closed"""
+        if connection is not None and self.pool is not None:
+            try:
+                self.pool.putconn(connection, close=bool(connection.closed))
+            finally:
+                self._pool_slots.release()
+    
+    def execute_prepared(self, cursor, name: str, sql: str, params: Tuple):
+        """Execute a statement through a server-side prepared statement.
+        
+        The statement is PREPAREd (with $n placeholders) the first time it is used
+        on a connection, so later calls skip parsing and planning on the server.
+        """
+        connection = cursor.connection
+        if name not in connection.prepared:
+            cursor.execute(f"PREPARE {name} AS {sql}")
+            connection.prepared.add(name)
+        placeholders = ", ".join(["%s"] * len(params))
+        cursor.execute(f"EXECUTE {name}({placeholders})", params)
+    
+    @contextmanager
+    def _cursor(self, **cursor_kwargs):
+        """Yield a cursor on a pooled connection inside one transaction.
+        
+        The connection's own context manager commits on success and rolls back on
+        any error; the cursor is always closed and the connection handed back to
+        the pool.
+        """
+        connection = self.get_connection()
+        if not connection:
+            raise Exception("Cannot connect to database")
+        try:
+            with connection, connection.cursor(**cursor_kwargs) as cursor:
+                yield cursor
+        finally:
+            self.release_connection(connection)
+    
     def connect(self):
         """Test database connection"""
         connection = self.get_connection()
         if connection:
-            connection.close()
+            self.release_connection(connection)
             logger.info("Successfully connected to PostgreSQL database")
             return True
         return False
@@ -46,11 +197,6 @@ class DatabaseManager:
     
     def create_tables(self):
         """Create all required tables """
-        connection = self.get_connection()
-        if not connection:
-            logger.error("Cannot create connection to database")
-            return False
-        
         tables = {
             'plots': """
                 CREATE TABLE IF NOT EXISTS plots (
@@ -89,294 +235,248 @@ class DatabaseManager:
             """
         }
         
+        # Create indexes for better performance. DOI and plot_identifier lookups are
+        # already served by the UNIQUE constraints' indexes, so the old standalone
+        # indexes on those columns are dropped rather than maintained on every insert.
+        indexes = [
+            "DROP INDEX IF EXISTS idx_plots_doi",
+            "DROP INDEX IF EXISTS idx_plots_identifier",
+            "DROP INDEX IF EXISTS idx_data_points_sandstone_id",
+            "CREATE INDEX IF NOT EXISTS idx_plots_created_at ON plots(created_at DESC)",
+            "CREATE INDEX IF NOT EXISTS idx_sandstones_plot_id ON sandstones(plot_id)",
+            "CREATE INDEX IF NOT EXISTS idx_data_points_sandstone_id_id "
+            "ON data_points(sandstone_id, id) INCLUDE (x_pixel, y_pixel, p_mpa, q_mpa)"
+        ]
+        
         try:
-            cursor = connection.cursor()
-            for table_name, query in tables.items():
-                cursor.execute(query)
-                logger.info(f"Table {table_name} created or verified")
-            
-            # Create indexes for better performance
-            indexes = [
-                "CREATE INDEX IF NOT EXISTS idx_sandstones_plot_id ON sandstones(plot_id)",
-                "CREATE INDEX IF NOT EXISTS idx_data_points_sandstone_id ON data_points(sandstone_id)",
-                "CREATE INDEX IF NOT EXISTS idx_plots_doi ON plots(doi)",
-                "CREATE INDEX IF NOT EXISTS idx_plots_identifier ON plots(plot_identifier)"
-            ]
-            
-            for index_query in indexes:
-                cursor.execute(index_query)
+            with self._cursor() as cursor:
+                # Send all DDL as one multi-statement script - a single round trip
+                ddl_script = ";\n".join(list(tables.values()) + indexes)
+                cursor.execute(ddl_script)
+                logger.info(f"Tables {', '.join(tables)} created or verified")
+                
+                # Refresh planner statistics now that the indexes exist
+                cursor.execute(f"ANALYZE {', '.join(tables)}")
             
-            connection.commit()
-            cursor.close()
-            connection.close()
             logger.info("PostgreSQL database successfully initialized")
             return True
-        except psycopg2.Error as e:
+        except Exception as e:
             logger.error(f"Error creating tables: {e}")
-            if connection:
-                connection.close()
             return False
     
     def check_plot_exists(self, doi: str, figure_number: str) -> bool:
         """Check if a plot with the given DOI and figure number already exists"""
-        connection = self.get_connection()
-        if not connection:
-            raise Exception("Cannot connect to database")
-            
         try:
-            cursor = connection.cursor()
-            cursor.execute("SELECT COUNT(*) FROM plots WHERE doi = %s AND figure_number = %s", (doi, figure_number))
-            count = cursor.fetchone()[0]
-            cursor.close()
-            connection.close()
-            return count > 0
+            with self._cursor() as cursor:
+                self.execute_prepared(cursor, "stmt_plot_exists", _SQL_CHECK_PLOT, (doi, figure_number))
+                return cursor.fetchone()['exists']
         except psycopg2.Error as e:
-            if connection:
-                connection.close()
             logger.error(f"Error checking plot existence: {e}")
             raise Exception(f"Database error: {e}")
     
     def generate_plot_identifier(self, doi: str, figure_number: str) -> str:
         """Generate a standardized plot identifier from DOI and figure number"""
         # Clean DOI by removing protocol and common prefixes
-        clean_doi = doi.replace('https://doi.org/', '').replace('http://doi.org/', '').replace('doi:', '')
-        # Replace special characters with underscores
-        clean_doi = clean_doi.replace('/', '_').replace('.', '_')
-        # Clean figure number
-        clean_fig = figure_number.replace(' ', '_').replace('.', '_')
+        clean_doi = doi
+        for prefix in _DOI_PREFIXES:
+            clean_doi = clean_doi.replace(prefix, '')
+        # Replace special characters with underscores (one pass each)
+        clean_doi = clean_doi.translate(_DOI_TRANS)
+        clean_fig = figure_number.translate(_FIGURE_TRANS)
         return f"{clean_doi}_Fig{clean_fig}"
     
     def save_complete_plot(self, plot_data: Dict) -> int:
         """Save complete plot data in a single transaction - NO IMAGE STORAGE"""
-        connection = self.get_connection()
-        if not connection:
-            raise Exception("Cannot connect to database")
-            
-        cursor = None
         try:
-            cursor = connection.cursor()
-            
-            # Begin transaction
-            cursor.execute("BEGIN")
-            
-            # Insert plot (without image_path)
-            cursor.execute("""
-                INSERT INTO plots (doi, figure_number, plot_identifier, x_axis_range, y_axis_range)
-                VALUES (%s, %s, %s, %s, %s)
-                RETURNING id
-            """, (
-                plot_data['doi'],
-                plot_data['figure_number'],
-                plot_data['plot_identifier'],
-                plot_data['x_axis_range'],
-                plot_data['y_axis_range']
-            ))
-            plot_id = cursor.fetchone()[0]
-            
-            # Group data points by sandstone
-            sandstone_data = {}
-            for point in plot_data['data_points']:
-                sandstone_name = point['dataset']
-                if sandstone_name not in sandstone_data:
-                    sandstone_data[sandstone_name] = []
-                sandstone_data[sandstone_name].append(point)
-            
-            # Insert sandstones and their data points
-            for sandstone_name, points in sandstone_data.items():
-                # Insert sandstone
-                cursor.execute("""
-                    INSERT INTO sandstones (plot_id, sandstone_name)
-                    VALUES (%s, %s)
-                    RETURNING id
-                """, (plot_id, sandstone_name))
-                sandstone_id = cursor.fetchone()[0]
+            # psycopg2 opens the transaction implicitly with the first statement
+            with self._cursor() as cursor:
+                # Insert plot (without image_path) - the duplicate check is folded into the insert
+                self.execute_prepared(cursor, "stmt_insert_plot", _SQL_INSERT_PLOT, (
+                    plot_data['doi'],
+                    plot_data['figure_number'],
+                    plot_data['plot_identifier'],
+                    plot_data['x_axis_range'],
+                    plot_data['y_axis_range']
+                ))
+                plot_row = cursor.fetchone()
                 
-                # Insert data points for this sandstone
-                point_values = [
-                    (sandstone_id, point['x_pixel'], point['y_pixel'], 
-                     point['P(MPa)'], point['Q(MPa)'])
-                    for point in points
-                ]
-                cursor.executemany("""
-                    INSERT INTO data_points (sandstone_id, x_pixel, y_pixel, p_mpa, q_mpa)
-                    VALUES (%s, %s, %s, %s, %s)
-                """, point_values)
+                if plot_row is None:
+                    # Nothing inserted - a plot with this DOI and figure number already exists
+                    raise Exception(f"Plot already exists: {plot_data['doi']} Figure {plot_data['figure_number']}")
+                
+                plot_id = plot_row['id']
+                
+                # Group data points by sandstone - one stable sort, then contiguous runs
+                get_dataset = itemgetter('dataset')
+                get_values = itemgetter('x_pixel', 'y_pixel', 'P(MPa)', 'Q(MPa)')
+                sorted_points = sorted(plot_data['data_points'], key=get_dataset)
+                
+                grouped_points = [(name, list(points)) for name, points in groupby(sorted_points, key=get_dataset)]
+                
+                # Insert all sandstones in one multi-row INSERT and map their ids by name
+                sandstone_rows = psycopg2.extras.execute_values(
+                    cursor,
+                    _SQL_INSERT_SANDSTONES,
+                    [(plot_id, name) for name, _ in grouped_points],
+                    page_size=max(len(grouped_points), 1),
+                    fetch=True
+                )
+                sandstone_ids = {row['sandstone_name']: row['id'] for row in sandstone_rows}
+                
+                # Buffer the data points as COPY text rows
+                copy_buffer = io.StringIO()
+                for sandstone_name, points in grouped_points:
+                    sandstone_id = sandstone_ids[sandstone_name]
+                    copy_buffer.writelines(
+                        f"{sandstone_id}\t{float(x)!r}\t{float(y)!r}\t{float(p)!r}\t{float(q)!r}\n"
+                        for x, y, p, q in map(get_values, points)
+                    )
+                
+                # Stream all data points in a single COPY
+                copy_buffer.seek(0)
+                cursor.copy_expert(_SQL_COPY_DATA_POINTS, copy_buffer)
             
-            # Commit transaction
-            cursor.execute("COMMIT")
-            cursor.close()
-            connection.close()
+            self._plots_cache = None
             logger.info(f"Plot '{plot_data['plot_identifier']}' saved successfully with ID {plot_id}")
             return plot_id
             
         except psycopg2.Error as e:
-            if cursor:
-                cursor.execute("ROLLBACK")
-                cursor.close()
-            if connection:
-                connection.close()
             logger.error(f"Error saving plot data: {e}")
             raise Exception(f"Database error: {e}")
     
     def get_all_plots(self) -> List[Dict]:
-        """Retrieve all plots with basic information"""
-        connection = self.get_connection()
-        if not connection:
-            raise Exception("Cannot connect to database")
-            
+        """Retrieve all plots with basic information.
+        
+        The listing is cached in-process and only re-queried when the plots table
+        fingerprint (row count and max id) changes, so unchanged reruns cost one
+        cheap aggregate over plots instead of the full listing query.
+        """
         try:
-            cursor = connection.cursor()
-            cursor.execute("""
-                SELECT p.id, p.doi, p.figure_number, p.plot_identifier, p.x_axis_range, p.y_axis_range, 
-                       p.created_at, COUNT(DISTINCT s.id) as sandstone_count,
-                       COUNT(dp.id) as total_points
-                FROM plots p
-                LEFT JOIN sandstones s ON p.id = s.plot_id
-                LEFT JOIN data_points dp ON s.id = dp.sandstone_id
-                GROUP BY p.id, p.doi, p.figure_number, p.plot_identifier, p.x_axis_range, p.y_axis_range, p.created_at
-                ORDER BY p.created_at DESC
-            """)
+            # Plain tuple cursor - avoids building a throwaway dict per row
+            with self._cursor(cursor_factory=psycopg2.extensions.cursor) as cursor:
+                cursor.execute(_SQL_PLOTS_VERSION)
+                version = cursor.fetchone()
+                
+                cached = self._plots_cache
+                if cached is not None and cached[0] == version:
+                    return [dict(plot) for plot in cached[1]]
+                
+                cursor.execute(_SQL_ALL_PLOTS)
+                rows = cursor.fetchall()
             
             plots = []
-            for row in cursor.fetchall():
+            for (plot_id, doi, figure_number, plot_identifier, x_axis_range, y_axis_range,
+                 created_at, sandstone_count, total_points) in rows:
                 plots.append({
-                    'id': row['id'],
-                    'doi': row['doi'],
-                    'figure_number': row['figure_number'],
-                    'plot_identifier': row['plot_identifier'],
-                    'x_axis_range': row['x_axis_range'],
-                    'y_axis_range': row['y_axis_range'],
-                    'created_at': datetime.fromisoformat(row['created_at'].isoformat()) if row['created_at'] else None,
-                    'sandstone_count': row['sandstone_count'],
-                    'total_points': row['total_points']
+                    'id': plot_id,
+                    'doi': doi,
+                    'figure_number': figure_number,
+                    'plot_identifier': plot_identifier,
+                    'x_axis_range': x_axis_range,
+                    'y_axis_range': y_axis_range,
+                    'created_at': created_at,
+                    'sandstone_count': sandstone_count,
+                    'total_points': total_points
                 })
             
-            cursor.close()
-            connection.close()
-            return plots
+            self._plots_cache = (version, plots)
+            return [dict(plot) for plot in plots]
         except psycopg2.Error as e:
-            if connection:
-                connection.close()
             logger.error(f"Error retrieving plots: {e}")
             raise Exception(f"Database error: {e}")
     
     def get_plot_data(self, plot_id: int) -> Optional[Dict]:
         """Retrieve complete data for a specific plot"""
-        connection = self.get_connection()
-        if not connection:
-            raise Exception("Cannot connect to database")
-            
         try:
-            cursor = connection.cursor()
-            
-            # Get plot info
-            cursor.execute("SELECT * FROM plots WHERE id = %s", (plot_id,))
-            plot_row = cursor.fetchone()
+            with self._cursor() as cursor:
+                # Get plot info with its data points aggregated server-side - one round trip
+                self.execute_prepared(cursor, "stmt_plot_columns", _SQL_PLOT_DATA, (plot_id,))
+                plot_row = cursor.fetchone()
             
             if not plot_row:
-                cursor.close()
-                connection.close()
                 return None
             
-            # Convert row to dict
+            # data_points is column-oriented: {column: [values...]}, ready for
+            # pd.DataFrame or NumPy; plots without points get an empty dict
             plot = dict(plot_row)
-            
-            # Get sandstones and data points
-            cursor.execute("""
-                SELECT s.sandstone_name, dp.x_pixel, dp.y_pixel, dp.p_mpa, dp.q_mpa
-                FROM sandstones s
-                JOIN data_points dp ON s.id = dp.sandstone_id
-                WHERE s.plot_id = %s
-                ORDER BY s.sandstone_name, dp.id
-            """, (plot_id,))
-            
-            data_points = []
-            for row in cursor.fetchall():
-                data_points.append(dict(row))
-            
-            cursor.close()
-            connection.close()
-            
-            # Format the response
-            plot['data_points'] = data_points
+            data_points = {column: plot.pop(column) for column in _DATA_POINT_COLUMNS}
+            plot['data_points'] = data_points if data_points['sandstone_name'] is not None else {}
             return plot
             
         except psycopg2.Error as e:
-            if connection:
-                connection.close()
             logger.error(f"Error retrieving plot data: {e}")
             raise Exception(f"Database error: {e}")
     
+    def iter_all_data_points(self, itersize: int = 2000) -> Iterator[Tuple]:
+        """Stream every data point with its plot details through a server-side cursor.
+        
+        Yields (sandstone_name, x_pixel, y_pixel, p_mpa, q_mpa, doi, figure_number,
+        plot_identifier) tuples, fetched from the server in batches of itersize rows.
+        """
+        try:
+            with self._cursor(name='all_data_points_stream',
+                              cursor_factory=psycopg2.extensions.cursor) as cursor:
+                cursor.itersize = itersize
+                cursor.execute(_SQL_ALL_DATA_POINTS)
+                yield from cursor
+        except psycopg2.Error as e:
+            logger.error(f"Error streaming data points: {e}")
+            raise Exception(f"Database error: {e}")
+    
     def delete_plot(self, plot_id: int) -> bool:
         """Delete a plot and all associated data"""
-        connection = self.get_connection()
-        if not connection:
-            raise Exception("Cannot connect to database")
-            
         try:
-            cursor = connection.cursor()
-            
-            # Delete plot (cascades to sandstones and data_points)
-            cursor.execute("DELETE FROM plots WHERE id = %s", (plot_id,))
-            affected_rows = cursor.rowcount
-            
-            connection.commit()
-            cursor.close()
-            connection.close()
+            with self._cursor() as cursor:
+                # Delete plot (cascades to sandstones and data_points)
+                cursor.execute(_SQL_DELETE_PLOT, (plot_id,))
+                affected_rows = cursor.rowcount
             
+            self._plots_cache = None
             logger.info(f"Plot {plot_id} deleted successfully")
             return affected_rows > 0
             
         except psycopg2.Error as e:
-            if connection:
-                connection.close()
             logger.error(f"Error deleting plot: {e}")
             raise Exception(f"Database error: {e}")
     
     def get_database_stats(self) -> Dict:
         """Get basic database statistics"""
-        connection = self.get_connection()
-        if not connection:
-            return {}
-            
         try:
-            cursor = connection.cursor()
-            
-            # Get table counts
-            cursor.execute("SELECT COUNT(*) FROM plots")
-            plot_count = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM sandstones")
-            sandstone_count = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM data_points")
-            point_count = cursor.fetchone()[0]
-            
-            # Get database size
-            cursor.execute("SELECT pg_size_pretty(pg_database_size(current_database()))")
-            db_size = cursor.fetchone()[0]
+            with self._cursor() as cursor:
+                # Get table counts and database size in one round trip
+                cursor.execute(_SQL_DATABASE_STATS)
+                return dict(cursor.fetchone())
             
-            cursor.close()
-            connection.close()
-            
-            return {
-                'plots': plot_count,
-                'sandstones': sandstone_count,
-                'data_points': point_count,
-                'database_size': db_size
-            }
-            
-        except psycopg2.Error as e:
-            if connection:
-                connection.close()
+        except Exception as e:
             logger.error(f"Error getting database stats: {e}")
             return {}
 
-# Global database manager instance
-db_manager = DatabaseManager()
+# Shared manager, created on first use; the lock stops concurrent first calls
+# (e.g. app.py's background init thread and a page) from building two pools
+_db_manager = None
+_db_manager_lock = threading.Lock()
+
+def get_db_manager() -> DatabaseManager:
+    """Return the shared database manager, creating it (and loading .env) on first use"""
+    global _db_manager
+    if _db_manager is None:
+        with _db_manager_lock:
+            if _db_manager is None:
+                # Load environment variables
+                load_dotenv()
+                _db_manager = DatabaseManager()
+    return _db_manager
+
+# Set once the schema has been created/verified in this process
+_initialized = False
 
 def init_database():
-    """Initialise database connection and create tables"""
+    """Initialise database connection and create tables (once per process)"""
+    global _initialized
+    if _initialized:
+        return True
+    db_manager = get_db_manager()
     if db_manager.connect():
-        return db_manager.create_tables()
+        _initialized = db_manager.create_tables()
+        return _initialized
     return False
\ No newline at end of file
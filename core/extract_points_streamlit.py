@@ -1,4 +1,5 @@
 import streamlit as st
+import numpy as np
 from core.streamlit_drawing import get_click_coordinates
 
 def extract_points_streamlit(image_pil, sandstone_name, pixel_to_data):
@@ -17,16 +18,18 @@ def extract_points_streamlit(image_pil, sandstone_name, pixel_to_data):
     if not points:
         return []
     
+    # Convert all clicks in one vectorized call on an (N, 2) array, then turn the
+    # result into plain Python floats in a single tolist() instead of per value
+    data_values = pixel_to_data(np.asarray(points, dtype=np.float64)).tolist()
+    
     # Convert to data points format
-    data_points = []
-    for x, y in points:
-        x_data, y_data = pixel_to_data(x, y)
-        data_points.append({
+    return [
+        {
             "dataset": sandstone_name,
             "x_pixel": x,
             "y_pixel": y,
             "P(MPa)": x_data,
             "Q(MPa)": y_data
-        })
-    
-    return data_points
\ No newline at end of file
+        }
+        for (x, y), (x_data, y_data) in zip(points, data_values)
+    ]
@@ -7,76 +7,128 @@ import os
 import streamlit as st
 import re
 import time
+import psycopg2.extensions
 from dotenv import load_dotenv
 from openai import OpenAI
 
-from core.database import db_manager
+from core.database import get_db_manager
 
 # Load environment variables for API access
 load_dotenv()
 
+# Precompiled SQL checks - one regex pass each instead of upper-casing the
+# whole query and scanning it once per keyword
+_ALLOWED_START_RE = re.compile(r'^\s*(SELECT|WITH|EXPLAIN)\b', re.IGNORECASE)
+# replace(...) is an ordinary string function, so REPLACE only counts as a
+# keyword when it isn't followed by an opening parenthesis
+_FORBIDDEN_RE = re.compile(
+    r'\b(INSERT|UPDATE|DELETE|DROP|CREATE|ALTER|TRUNCATE|REPLACE(?!\s*\()|MERGE|CALL|EXEC|PRAGMA|ATTACH|DETACH)\b',
+    re.IGNORECASE
+)
+# Comments, string literals and quoted identifiers, matched left to right so a
+# quote inside a comment (or vice versa) can't pair up with the wrong token
+_QUOTED_OR_COMMENT_RE = re.compile(
+    r"--[^\n]*|/\*.*?\*/"          # line and block comments
+    r"|'(?:[^']|'')*'"              # string literals ('' escapes a quote)
+    r'|"(?:[^"]|"")*"',             # quoted identifiers
+    re.DOTALL
+)
+_TABLE_REF_RE = re.compile(r'\b(plots|sandstones|data_points)\.', re.IGNORECASE)
+_JOIN_RE = re.compile(r'\bJOIN\b', re.IGNORECASE)
+_EXPLAIN_START_RE = re.compile(r'^\s*EXPLAIN\b', re.IGNORECASE)
+_LIMIT_RE = re.compile(r'LIMIT', re.IGNORECASE)
+_LIMIT_VALUE_RE = re.compile(r'LIMIT\s+(\d+)', re.IGNORECASE)
+_DOI_URL_RE = re.compile(r'https://doi\.org/', re.IGNORECASE)
+_DOI_WHERE_RE = re.compile(r"plots\.doi\s*=\s*'([^']+)'", re.IGNORECASE)
+
 # =============================================================================
 # REGULAR SQL QUERY FUNCTIONS
 # =============================================================================
 
-def is_read_only_query(query):
-    """Check if query is read-only (SELECT only)"""
-    query_clean = query.strip().upper()
-    
-    # Allow SELECT, WITH (for CTEs), and EXPLAIN
-    allowed_starts = ['SELECT', 'WITH', 'EXPLAIN']
-    
-    # Check if query starts with allowed keywords
-    for start in allowed_starts:
-        if query_clean.startswith(start):
-            return True
+# Maximum number of rows returned by any query
+MAX_QUERY_ROWS = 50
+
+def _keyword_scan_text(sql):
+    """
+    Blank out comments, string literals and quoted identifiers so keyword checks
+    only see SQL code - WHERE doi = 'Call 1' is not a CALL
     
-    return False
+    Backslash escapes and dollar quoting can't be tokenised reliably by a regex,
+    so queries using them are scanned unchanged (stricter, never looser).
+    """
+    if '\\' in sql or '$' in sql:
+        return sql
+    return _QUOTED_OR_COMMENT_RE.sub(' ', sql)
 
-def execute_sql_query(query):
-    """Execute SQL query with safety checks"""
+def validate_sql(sql_query):
+    """
+    Validate a query and normalise it for execution
+    
+    Args:
+        sql_query: SQL text, typed by the user or generated from natural language
+        
+    Returns:
+        tuple: (ok, reason, normalized_sql) - normalized_sql is the single read-only
+        statement without trailing semicolons and capped at MAX_QUERY_ROWS rows,
+        or None when the query is rejected
+    """
+    if not sql_query or not sql_query.strip():
+        return False, "Empty query", None
     
     # Clean up query - remove trailing semicolons and whitespace
-    query = query.strip().rstrip(';')
+    sql_clean = sql_query.strip().rstrip(';').strip()
     
-    # Check if query is read-only
-    if not is_read_only_query(query):
-        raise ValueError("Only SELECT queries are allowed for security reasons")
+    # Check if starts with allowed operation (SELECT, WITH for CTEs, EXPLAIN)
+    if not _ALLOWED_START_RE.match(sql_clean):
+        return False, "Only SELECT, WITH, EXPLAIN queries allowed", None
+    
+    # Check for forbidden keywords anywhere in the SQL code (whole words only,
+    # ignoring comments and quoted text)
+    code_only = _keyword_scan_text(sql_clean)
+    forbidden_match = _FORBIDDEN_RE.search(code_only)
+    if forbidden_match:
+        return False, f"Forbidden operation detected: {forbidden_match.group(1).upper()}", None
+    
+    # Check for multiple statements (basic SQL injection protection)
+    if ';' in code_only:
+        return False, "Multiple statements not allowed. Please execute one query at a time.", None
     
-    # Check for multiple statements (basic protection)
-    if ';' in query:
-        raise ValueError("Multiple statements not allowed. Please execute one query at a time.")
+    # Add LIMIT 50 if not already present, or lower a larger existing LIMIT
+    limit_match = _LIMIT_VALUE_RE.search(sql_clean)
+    if limit_match is None:
+        if not _LIMIT_RE.search(sql_clean):
+            sql_clean += f" LIMIT {MAX_QUERY_ROWS}"
+    elif int(limit_match.group(1)) > MAX_QUERY_ROWS:
+        sql_clean = _LIMIT_VALUE_RE.sub(f"LIMIT {MAX_QUERY_ROWS}", sql_clean)
     
+    return True, "Query is safe", sql_clean
+
+def is_read_only_query(query):
+    """Check if query is read-only (SELECT only)"""
+    # Allow SELECT, WITH (for CTEs), and EXPLAIN
+    return _ALLOWED_START_RE.match(query) is not None
+
+def run_validated_query(query):
+    """Execute a query already normalised by validate_sql"""
+    db_manager = connection = None
     try:
+        db_manager = get_db_manager()
         connection = db_manager.get_connection()
         if not connection:
             raise Exception("Cannot connect to database")
         
-        cursor = connection.cursor()
-        
-        # Add LIMIT 50 if not already present (check case insensitively)
-        query_upper = query.upper()
-        if 'LIMIT' not in query_upper:
-            query += " LIMIT 50"
-        else:
-            # If LIMIT exists, check if it's higher than 50
-            limit_match = re.search(r'LIMIT\s+(\d+)', query_upper)
-            if limit_match:
-                existing_limit = int(limit_match.group(1))
-                if existing_limit > 50:
-                    # Replace with LIMIT 50
-                    query = re.sub(r'LIMIT\s+\d+', 'LIMIT 50', query, flags=re.IGNORECASE)
-        
+        # Plain tuple cursor - rows go straight into a DataFrame with explicit columns
+        cursor = connection.cursor(cursor_factory=psycopg2.extensions.cursor)
         cursor.execute(query)
         
         # Get column names
         columns = [description[0] for description in cursor.description]
         
-        # Get results
-        results = cursor.fetchall()
+        # Get results - never materialise more than the row cap, even when the
+        # LIMIT only applies to a subquery
+        results = cursor.fetchmany(MAX_QUERY_ROWS)
         
         cursor.close()
-        connection.close()
         
         return {
             'success': True,
@@ -90,6 +142,18 @@ def execute_sql_query(query):
             'success': False,
             'error': str(e)
         }
+    finally:
+        # Always hand the connection back to the pool (if one was ever obtained)
+        if db_manager is not None and connection is not None:
+            db_manager.release_connection(connection)
+
+def execute_sql_query(query):
+    """Execute SQL query with safety checks"""
+    is_valid, message, normalized_query = validate_sql(query)
+    if not is_valid:
+        raise ValueError(message)
+    
+    return run_validated_query(normalized_query)
 
 def add_to_query_history(query):
     """Add query to session state history"""
@@ -131,37 +195,8 @@ WHERE p.doi = '10.1016/j.example.2023.01.001'
 
 def is_safe_sql(sql_query):
     """Check if generated SQL is read-only and safe"""
-    
-    if not sql_query or not sql_query.strip():
-        return False, "Empty query"
-    
-    sql_upper = sql_query.strip().upper()
-    
-    # Allowed operations
-    allowed_starts = ['SELECT', 'WITH', 'EXPLAIN']
-    
-    # Forbidden operations  
-    forbidden_keywords = [
-        'INSERT', 'UPDATE', 'DELETE', 'DROP', 'CREATE', 'ALTER', 
-        'TRUNCATE', 'REPLACE', 'MERGE', 'CALL', 'EXEC',
-        'PRAGMA', 'ATTACH', 'DETACH'
-    ]
-    
-    # Check if starts with allowed operation
-    if not any(sql_upper.startswith(start) for start in allowed_starts):
-        return False, f"Only {', '.join(allowed_starts)} queries allowed"
-    
-    # Check for forbidden keywords anywhere in query
-    for keyword in forbidden_keywords:
-        if keyword in sql_upper:
-            return False, f"Forbidden operation detected: {keyword}"
-    
-    # Check for multiple statements (basic SQL injection protection)
-    sql_clean = sql_query.rstrip(';').strip()
-    if ';' in sql_clean:
-        return False, "Multiple statements not allowed"
-    
-    return True, "Query is safe"
+    is_valid, message, _ = validate_sql(sql_query)
+    return is_valid, message
 
 def validate_and_suggest_sql_fixes(sql_query):
     """Validate generated SQL and suggest fixes for common issues"""
@@ -180,18 +215,10 @@ def validate_and_suggest_sql_fixes(sql_query):
         suggestions.append("Review both original and fixed versions shown above")
         sql_query = actual_sql
     
-    sql_upper = sql_query.upper()
-    
     # Check for missing JOINs when referencing multiple tables
-    tables_referenced = []
-    if 'PLOTS.' in sql_upper:
-        tables_referenced.append('plots')
-    if 'SANDSTONES.' in sql_upper:
-        tables_referenced.append('sandstones')  
-    if 'DATA_POINTS.' in sql_upper:
-        tables_referenced.append('data_points')
+    tables_referenced = {table.lower() for table in _TABLE_REF_RE.findall(sql_query)}
     
-    joins_present = sql_upper.count('JOIN')
+    joins_present = len(_JOIN_RE.findall(sql_query))
     
     # If we reference multiple tables but don't have enough JOINs
     if len(tables_referenced) > 1 and joins_present < (len(tables_referenced) - 1):
@@ -199,7 +226,7 @@ def validate_and_suggest_sql_fixes(sql_query):
         suggestions.append("Add proper JOINs: plots -> sandstones -> data_points")
     
     # Check for DOI format issues
-    if 'HTTPS://DOI.ORG/' in sql_upper:
+    if _DOI_URL_RE.search(sql_query):
         issues.append("DOI contains URL prefix")
         suggestions.append("Remove 'https://doi.org/' from DOI - database stores just the DOI number")
     
@@ -211,17 +238,29 @@ def test_and_fix_sql(original_sql):
     if not original_sql:
         return original_sql, False, "No SQL to test"
     
-    # First, try to execute the original SQL
+    # Only plan SQL that passes the safety checks - the string is sent to the server,
+    # so it must be a single read-only statement
+    is_safe, safety_message = is_safe_sql(original_sql)
+    if not is_safe:
+        return original_sql, False, f"Cannot test SQL: {safety_message}"
+    
+    # EXPLAIN cannot be nested (and EXPLAIN ANALYZE would run the query)
+    if _EXPLAIN_START_RE.match(original_sql):
+        return original_sql, False, "EXPLAIN query not pre-validated"
+    
+    # First, try to plan the original SQL
+    db_manager = connection = None
     try:
-        # Do a quick syntax/table check without actually running
+        # Do a quick syntax/table check without actually running - PostgreSQL
+        # parses and plans the statement but never executes it
+        db_manager = get_db_manager()
         connection = db_manager.get_connection()
         if not connection:
             return original_sql, False, "Cannot connect to database"
         
-        cursor = connection.cursor()
-        cursor.execute("EXPLAIN QUERY PLAN " + original_sql)
+        cursor = connection.cursor(cursor_factory=psycopg2.extensions.cursor)
+        cursor.execute("EXPLAIN " + original_sql.strip().rstrip(';'))
         cursor.close()
-        connection.close()
         
         # If we get here, the SQL is valid
         return original_sql, False, "SQL is valid"
@@ -230,19 +269,17 @@ def test_and_fix_sql(original_sql):
         error_msg = str(e).lower()
         
         # Check for specific error patterns we can fix
-        if "no such column: plots.doi" in error_msg or "plots.doi" in error_msg:
+        missing_plots = 'missing from-clause entry for table "plots"' in error_msg
+        if "plots.doi" in error_msg or (missing_plots and "plots.doi" in original_sql.lower()):
             # This is the missing plots table issue - apply fix
             
             # Extract DOI value from WHERE clause
-            doi_value = "UNKNOWN_DOI"
-            if "plots.doi = '" in original_sql:
-                start = original_sql.find("plots.doi = '") + len("plots.doi = '")
-                end = original_sql.find("'", start)
-                if end > start:
-                    doi_value = original_sql[start:end]
+            doi_match = _DOI_WHERE_RE.search(original_sql)
+            doi_value = doi_match.group(1) if doi_match else "UNKNOWN_DOI"
             
-            # Clean DOI URLs
-            doi_value = doi_value.replace('https://doi.org/', '').replace('http://doi.org/', '').replace('doi:', '')
+            # Clean DOI URLs (all prefixes contain 'doi')
+            if 'doi' in doi_value:
+                doi_value = doi_value.replace('https://doi.org/', '').replace('http://doi.org/', '').replace('doi:', '')
             
             # Create the corrected SQL
             fixed_sql = f"""SELECT s.sandstone_name, dp.p_mpa, dp.q_mpa 
@@ -256,6 +293,11 @@ WHERE p.doi = '{doi_value}'"""
         else:
             # Different error, can't auto-fix
             return original_sql, False, f"Cannot auto-fix: {str(e)}"
+    
+    finally:
+        # Always hand the connection back to the pool (if one was ever obtained)
+        if db_manager is not None and connection is not None:
+            db_manager.release_connection(connection)
 
 def clean_user_question(question):
     """Clean up user question to improve SQL generation"""
@@ -263,6 +305,10 @@ def clean_user_question(question):
     if not question:
         return question
     
+    # Fast path - every prefix below contains 'doi', so most questions skip the replaces
+    if 'doi' not in question:
+        return question.strip()
+    
     # Clean DOI formats
     question = question.replace('https://doi.org/', '')
     question = question.replace('http://doi.org/', '')
@@ -273,44 +319,8 @@ def clean_user_question(question):
 
 # Generate SQL from natural language
 
-def generate_sql_from_nl(question):
-    """Generate SQL from natural language with rate limiting"""
-    
-    if not question or not question.strip():
-        return None
-    
-    # Simple rate limiting - wait 3 seconds between requests
-    if 'last_nl_request' not in st.session_state:
-        st.session_state.last_nl_request = 0
-    
-    time_since_last = time.time() - st.session_state.last_nl_request
-    if time_since_last < 3:
-        wait_time = 3 - time_since_last
-        st.warning(f"⏱️ **Rate limit protection**: Please wait {wait_time:.1f} seconds")
-        time.sleep(wait_time)
-    
-    st.session_state.last_nl_request = time.time()
-    
-    # Clean the question
-    cleaned_question = clean_user_question(question)
-    
-    # Check for HF_TOKEN
-    openrouter_token = os.environ.get('OPENROUTER_API_KEY') or st.secrets.get('OPENROUTER_API_KEY')
-    
-    if not openrouter_token:
-        st.error("""
-        ❌ **API Token Required**
-        Add OPENROUTER_API_KEY to your app secrets or use the SQL Query tab.
-        """)
-        return None
-    
-    client = OpenAI(
-        base_url = "https://openrouter.ai/api/v1",
-        api_key=openrouter_token,
-    )
-    
-    # Prompt for SQL generation
-    system_prompt = """You are an expert SQL generator for a rock mechanics research database.
+# Prompt for SQL generation
+_NL_SQL_SYSTEM_PROMPT = """You are an expert SQL generator for a rock mechanics research database.
 
 DATABASE: PostgreSQL - Use PostgreSQL syntax and functions only
 For complex string operations, prefer: SUBSTRING(), SPLIT_PART(), regex patterns
@@ -391,12 +401,53 @@ When users ask about combinations like "high porosity" or "recent wet sandstone
 - Return research-appropriate result sets
 
 Generate ONLY the SQL query, no explanations."""
+
+@st.cache_resource(show_spinner=False)
+def _get_llm_client(api_key):
+    """OpenRouter client - cached so its HTTP connection pool is reused across reruns"""
+    return OpenAI(
+        base_url = "https://openrouter.ai/api/v1",
+        api_key=api_key,
+    )
+
+def generate_sql_from_nl(question):
+    """Generate SQL from natural language with rate limiting"""
+    
+    if not question or not question.strip():
+        return None
+    
+    # Simple rate limiting - wait 3 seconds between requests
+    if 'last_nl_request' not in st.session_state:
+        st.session_state.last_nl_request = 0
+    
+    time_since_last = time.time() - st.session_state.last_nl_request
+    if time_since_last < 3:
+        wait_time = 3 - time_since_last
+        st.warning(f"⏱️ **Rate limit protection**: Please wait {wait_time:.1f} seconds")
+        time.sleep(wait_time)
+    
+    st.session_state.last_nl_request = time.time()
+    
+    # Clean the question
+    cleaned_question = clean_user_question(question)
+    
+    # Check for HF_TOKEN
+    openrouter_token = os.environ.get('OPENROUTER_API_KEY') or st.secrets.get('OPENROUTER_API_KEY')
+    
+    if not openrouter_token:
+        st.error("""
+        ❌ **API Token Required**
+        Add OPENROUTER_API_KEY to your app secrets or use the SQL Query tab.
+        """)
+        return None
+    
+    client = _get_llm_client(openrouter_token)
     
     try:
         completion = client.chat.completions.create(
             model="meta-llama/llama-4-scout:free",
             messages=[
-                {"role": "system", "content": system_prompt},
+                {"role": "system", "content": _NL_SQL_SYSTEM_PROMPT},
                 {"role": "user", "content": f"Generate SQL for: {cleaned_question}"}
             ],
             max_tokens=150,
@@ -430,7 +481,7 @@ def execute_nl_generated_sql(sql_query):
             sql_query = parts[1].strip()
     
     # Security validation
-    is_safe, safety_message = is_safe_sql(sql_query)
+    is_safe, safety_message, normalized_sql = validate_sql(sql_query)
     if not is_safe:
         return {
             'success': False,
@@ -440,7 +491,7 @@ def execute_nl_generated_sql(sql_query):
     
     # Execute using existing safe SQL execution
     try:
-        result = execute_sql_query(sql_query)
+        result = run_validated_query(normalized_sql)
         
         if result['success']:
             return {
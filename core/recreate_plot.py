@@ -1,15 +1,86 @@
+import io
+import sys
+from functools import lru_cache
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import streamlit as st
-from core.database import db_manager
+from core.database import get_db_manager
 import numpy as np
-from PIL import Image
+
+# Scatter layers with more points than this are rasterized so saved vector
+# figures (PDF/SVG) stay small; axes and labels remain vector
+RASTERIZE_THRESHOLD = 5000
+
+# Columns of the data points returned by get_db_manager().get_plot_data()
+_DATA_POINT_COLUMNS = ['sandstone_name', 'x_pixel', 'y_pixel', 'p_mpa', 'q_mpa']
+
+@lru_cache(maxsize=32)
+def _set1_palette(n: int) -> np.ndarray:
+    """
+    Sample n evenly spaced RGBA colors from the Set1 colormap
+    
+    The array is shared between callers, so it is returned read-only.
+    
+    Args:
+        n: Number of colors (one per sandstone)
+        
+    Returns:
+        np.ndarray: (n, 4) array of RGBA colors
+    """
+    import matplotlib.pyplot as plt
+    palette = plt.cm.Set1(np.linspace(0, 1, n))
+    palette.setflags(write=False)
+    return palette
+
+@lru_cache(maxsize=8)
+def _load_image(path: str, max_dim: int = 2048):
+    """
+    Load an original plot image, downsampled to at most max_dim pixels per side
+    
+    Args:
+        path: Path of the image file
+        max_dim: Longest side of the returned image
+        
+    Returns:
+        tuple: (read-only pixel array, (width, height) of the original image)
+    """
+    from PIL import Image
+    
+    with Image.open(path) as img:
+        original_size = img.size
+        # Palette/greyscale images would otherwise come back as index arrays that
+        # imshow colour-maps instead of showing their real colours
+        has_alpha = img.mode in ('RGBA', 'LA', 'PA') or 'transparency' in img.info
+        img = img.convert('RGBA' if has_alpha else 'RGB')
+        img.thumbnail((max_dim, max_dim), Image.Resampling.LANCZOS)
+        pixels = np.array(img)
+    pixels.setflags(write=False)
+    return pixels, original_size
+
+def _legend_handles(sandstone_names, colors, **marker_style):
+    """
+    Build one legend proxy per sandstone for a single multi-coloured scatter
+    
+    Args:
+        sandstone_names: Sandstone names in legend order
+        colors: Colors indexed like sandstone_names
+        **marker_style: Line2D marker styling matching the scatter
+        
+    Returns:
+        list: Line2D handles for ax.legend(handles=...)
+    """
+    from matplotlib.lines import Line2D
+    return [
+        Line2D([], [], linestyle='', color=colors[i], label=name, **marker_style)
+        for i, name in enumerate(sandstone_names)
+    ]
 
 def get_plot_data_for_recreation(plot_id: int):
     """
     Get all data needed to recreate a plot from the database
     
+    Results are cached per plot_id, so repeated calls share the same dict,
+    DataFrame and arrays - treat the returned data as read-only.
+    
     Args:
         plot_id: ID of the plot to recreate
         
@@ -17,50 +88,103 @@ def get_plot_data_for_recreation(plot_id: int):
         dict: Contains plot metadata and formatted data for plotting
     """
     try:
-        # Get complete plot data from database
-        plot_data = db_manager.get_plot_data(plot_id)
+        return _load_recreation_data(plot_id)
         
-        if not plot_data:
-            print(f"No plot found with ID {plot_id}")
-            return None
+    except _PlotNotFound:
+        print(f"No plot found with ID {plot_id}")
+        return None
+        
+    except Exception as e:
+        print(f"Error retrieving plot data: {e}")
+        return None
+
+class _PlotNotFound(Exception):
+    """Raised by _load_recreation_data so missing plots are never cached"""
+
+# Saved plots are never modified in place, so entries only go stale when a plot
+# is deleted; failed lookups raise and are therefore never cached
+@lru_cache(maxsize=128)
+def _load_recreation_data(plot_id: int):
+    """
+    Fetch a plot and build its recreation data, raising _PlotNotFound if it doesn't exist
+    
+    Args:
+        plot_id: ID of the plot to recreate
         
-        # Extract plot metadata
-        plot_info = {
-            'doi': plot_data['doi'],
-            'figure_number': plot_data['figure_number'],
-            'plot_identifier': plot_data['plot_identifier'],
-            'x_axis_range': plot_data['x_axis_range'],
-            'y_axis_range': plot_data['y_axis_range'],
-            'image_path': plot_data['image_path'],
-            'created_at': plot_data['created_at']
+    Returns:
+        dict: Contains plot metadata and formatted data for plotting
+    """
+    # Get complete plot data from database
+    plot_data = get_db_manager().get_plot_data(plot_id)
+    
+    if not plot_data:
+        raise _PlotNotFound(plot_id)
+    
+    # Extract plot metadata - plots rows carry no image_path column (images are
+    # saved to disk separately), so it is optional here
+    plot_info = {
+        'doi': plot_data['doi'],
+        'figure_number': plot_data['figure_number'],
+        'plot_identifier': plot_data['plot_identifier'],
+        'x_axis_range': plot_data['x_axis_range'],
+        'y_axis_range': plot_data['y_axis_range'],
+        'image_path': plot_data.get('image_path'),
+        'created_at': plot_data['created_at']
+    }
+    
+    # Data points arrive column-oriented, so each column maps straight onto an array
+    if plot_data['data_points']:
+        columns = {
+            column: np.asarray(plot_data['data_points'][column],
+                               dtype=object if column == 'sandstone_name' else np.float64)
+            for column in _DATA_POINT_COLUMNS
         }
         
-        # Convert data points to DataFrame for easy manipulation
-        if plot_data['data_points']:
-            df = pd.DataFrame(plot_data['data_points'])
-            
-            # Group data by sandstone for plotting
-            sandstone_data = {}
-            for sandstone in df['sandstone_name'].unique():
-                sandstone_df = df[df['sandstone_name'] == sandstone]
-                sandstone_data[sandstone] = {
-                    'P_MPa': sandstone_df['p_mpa'].values,
-                    'Q_MPa': sandstone_df['q_mpa'].values,
-                    'x_pixel': sandstone_df['x_pixel'].values,
-                    'y_pixel': sandstone_df['y_pixel'].values
-                }
-        else:
-            sandstone_data = {}
+        # Code the sandstone names once
+        names, first_index, inverse, counts = np.unique(
+            columns['sandstone_name'], return_index=True, return_inverse=True, return_counts=True
+        )
         
-        return {
-            'plot_info': plot_info,
-            'sandstone_data': sandstone_data,
-            'raw_dataframe': df if plot_data['data_points'] else pd.DataFrame()
+        # np.unique already coded the names, so the categorical column comes for free
+        df = pd.DataFrame(columns)
+        df['sandstone_name'] = pd.Categorical.from_codes(inverse, categories=names)
+        
+        # Sort once so each sandstone's points are contiguous, then hand out slices
+        # (fancy indexing yields C-contiguous arrays, so every slice is stride-1)
+        order = np.argsort(inverse, kind='stable')
+        # Plotting arrays are float32 - lossless, since the columns are stored as REAL
+        grouped = {
+            column: columns[column][order].astype(np.float32)
+            for column in ('p_mpa', 'q_mpa', 'x_pixel', 'y_pixel')
         }
+        starts = np.cumsum(counts) - counts
         
-    except Exception as e:
-        print(f"Error retrieving plot data: {e}")
-        return None
+        # Group data by sandstone for plotting (first-seen order)
+        group_order = np.argsort(first_index)
+        sandstone_data = {}
+        for group in group_order:
+            rows = slice(starts[group], starts[group] + counts[group])
+            sandstone_data[names[group]] = {
+                'P_MPa': grouped['p_mpa'][rows],
+                'Q_MPa': grouped['q_mpa'][rows],
+                'x_pixel': grouped['x_pixel'][rows],
+                'y_pixel': grouped['y_pixel'][rows]
+            }
+        
+        # Per-row position of its sandstone in sandstone_data, i.e. its palette index
+        group_rank = np.empty_like(group_order)
+        group_rank[group_order] = np.arange(len(group_order))
+        color_index = group_rank[inverse]
+    else:
+        sandstone_data = {}
+        color_index = np.empty(0, dtype=np.intp)
+    
+    return {
+        'plot_info': plot_info,
+        'sandstone_data': sandstone_data,
+        'color_index': color_index,
+        'raw_dataframe': df if plot_data['data_points'] else pd.DataFrame(columns=_DATA_POINT_COLUMNS)
+    }
 
 def recreate_qp_plot(plot_id: int, save_path: str = None, show_plot: bool = True):
     """
@@ -71,6 +195,7 @@ def recreate_qp_plot(plot_id: int, save_path: str = None, show_plot: bool = True
         save_path: Optional path to save the plot
         show_plot: Whether to display the plot
     """
+    import matplotlib.pyplot as plt
     
     # Get data from database
     data = get_plot_data_for_recreation(plot_id)
@@ -86,52 +211,52 @@ def recreate_qp_plot(plot_id: int, save_path: str = None, show_plot: bool = True
         return None
     
     # Create the plot
-    plt.figure(figsize=(10, 8))
+    fig, ax = plt.subplots(figsize=(10, 8), layout='constrained')
+    df = data['raw_dataframe']
+    rasterized = len(df) > RASTERIZE_THRESHOLD
     
     # Define colors for different sandstones
-    colors = plt.cm.Set1(np.linspace(0, 1, len(sandstone_data)))
-    
-    # Plot each sandstone dataset
-    for i, (sandstone_name, data_points) in enumerate(sandstone_data.items()):
-        plt.scatter(
-            data_points['P_MPa'], 
-            data_points['Q_MPa'],
-            label=sandstone_name,
-            color=colors[i],
-            alpha=0.7,
-            s=50
-        )
+    colors = _set1_palette(len(sandstone_data))
+    
+    # Plot every sandstone dataset as one collection, colored per point
+    ax.scatter(
+        df['p_mpa'].to_numpy(dtype=np.float32), 
+        df['q_mpa'].to_numpy(dtype=np.float32),
+        c=colors[data['color_index']],
+        alpha=0.7,
+        s=50,
+        rasterized=rasterized
+    )
     
     # Customize the plot
-    plt.xlabel('P (MPa)', fontsize=12)
-    plt.ylabel('Q (MPa)', fontsize=12)
-    plt.title(f'Recreated Q-P Plot: {plot_info["doi"]} Fig {plot_info["figure_number"]}', fontsize=14, fontweight='bold')
-    plt.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
-    plt.grid(True, alpha=0.3)
+    ax.set_xlabel('P (MPa)', fontsize=12)
+    ax.set_ylabel('Q (MPa)', fontsize=12)
+    ax.set_title(f'Recreated Q-P Plot: {plot_info["doi"]} Fig {plot_info["figure_number"]}', fontsize=14, fontweight='bold')
+    ax.legend(handles=_legend_handles(sandstone_data, colors, marker='o', markersize=np.sqrt(50), alpha=0.7),
+              bbox_to_anchor=(1.05, 1), loc='upper left')
+    ax.grid(True, alpha=0.3)
     
     # Add metadata as text
-    plt.figtext(0.02, 0.02, 
-                f"DOI: {plot_info['doi']} | Figure: {plot_info['figure_number']}\n"
-                f"Ranges - X: {plot_info['x_axis_range']}, Y: {plot_info['y_axis_range']}\n"
-                f"Digitized: {plot_info['created_at']}", 
-                fontsize=8, style='italic')
-    
-    plt.tight_layout()
+    fig.text(0.02, 0.02, 
+             f"DOI: {plot_info['doi']} | Figure: {plot_info['figure_number']}\n"
+             f"Ranges - X: {plot_info['x_axis_range']}, Y: {plot_info['y_axis_range']}\n"
+             f"Digitized: {plot_info['created_at']}", 
+             fontsize=8, style='italic')
     
     # Save if requested
     if save_path:
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
+        fig.savefig(save_path, dpi=300, bbox_inches='tight')
         print(f"Plot saved to: {save_path}")
     
     # Show if requested
     if show_plot:
         plt.show()
     
-    return plt.gcf()
+    return fig
 
 def export_plot_data_to_csv(plot_id: int, output_path: str = None):
     """
-    Export plot data to CSV format
+    Export plot data to CSV format, or to Parquet if output_path ends in .parquet
     
     Args:
         plot_id: ID of the plot to export
@@ -151,11 +276,17 @@ def export_plot_data_to_csv(plot_id: int, output_path: str = None):
     if not output_path:
         output_path = f"{plot_identifier}_recreated_data.csv"
     
-    # Export to CSV
-    df.to_csv(output_path, index=False)
+    # Parquet is typed and columnar - much faster to write than CSV text
+    if output_path.endswith('.parquet'):
+        df.to_parquet(output_path, engine='pyarrow', compression='snappy', index=False)
+    else:
+        # Floats keep their full repr so values round-trip; a large buffer batches writes
+        with open(output_path, 'w', buffering=1 << 20, encoding='utf-8', newline='') as f:
+            df.to_csv(f, index=False, lineterminator='\n')
     print(f"Data exported to: {output_path}")
     
-    return df
+    # The frame is shared with the recreation cache - hand callers their own copy
+    return df.copy()
 
 def compare_digitized_vs_original(plot_id: int):
     """
@@ -164,7 +295,7 @@ def compare_digitized_vs_original(plot_id: int):
     Args:
         plot_id: ID of the plot to analyze
     """
-    from PIL import Image
+    import matplotlib.pyplot as plt
     
     data = get_plot_data_for_recreation(plot_id)
     
@@ -172,26 +303,37 @@ def compare_digitized_vs_original(plot_id: int):
         return None
     
     plot_info = data['plot_info']
-    sandstone_data = data['sandstone_data']
+    
+    if not plot_info['image_path']:
+        print("No original image stored for this plot")
+        return None
     
     # Load original image
     try:
-        img = Image.open(plot_info['image_path'])
+        img, (width, height) = _load_image(plot_info['image_path'])
         
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6))
+        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6), layout='constrained')
         
         # Left plot: Original image with digitized points overlaid
-        ax1.imshow(img)
-        colors = plt.cm.Set1(np.linspace(0, 1, len(sandstone_data)))
+        # The extent maps the downsampled image back onto original pixel coordinates
+        ax1.imshow(img, extent=(-0.5, width - 0.5, height - 0.5, -0.5))
+        sandstone_data = data['sandstone_data']
+        rasterized = len(data['raw_dataframe']) > RASTERIZE_THRESHOLD
+        colors = _set1_palette(len(sandstone_data))
         
+        # Markers are uniform within each sandstone, so marker-only lines
+        # (one stamped marker per artist) draw faster than scatter
         for i, (sandstone_name, data_points) in enumerate(sandstone_data.items()):
-            ax1.scatter(
+            ax1.plot(
                 data_points['x_pixel'], 
                 data_points['y_pixel'],
+                marker='o',
+                linestyle='',
                 label=sandstone_name,
                 color=colors[i],
-                s=30,
-                alpha=0.8
+                markersize=np.sqrt(30),
+                alpha=0.8,
+                rasterized=rasterized
             )
         
         ax1.set_title(f'Original Image: {plot_info["doi"]} Fig {plot_info["figure_number"]}')
@@ -201,13 +343,16 @@ def compare_digitized_vs_original(plot_id: int):
         
         # Right plot: Recreated Q-P plot
         for i, (sandstone_name, data_points) in enumerate(sandstone_data.items()):
-            ax2.scatter(
+            ax2.plot(
                 data_points['P_MPa'], 
                 data_points['Q_MPa'],
+                marker='o',
+                linestyle='',
                 label=sandstone_name,
                 color=colors[i],
+                markersize=np.sqrt(50),
                 alpha=0.7,
-                s=50
+                rasterized=rasterized
             )
         
         ax2.set_xlabel('P (MPa)')
@@ -216,7 +361,6 @@ def compare_digitized_vs_original(plot_id: int):
         ax2.legend()
         ax2.grid(True, alpha=0.3)
         
-        plt.tight_layout()
         plt.show()
         
         return fig
@@ -242,28 +386,41 @@ def get_summary_statistics(plot_id: int):
     df = data['raw_dataframe']
     plot_info = data['plot_info']
     
-    print(f"\n=== SUMMARY FOR PLOT: {plot_info['doi']} Fig {plot_info['figure_number']} ===")
-    print(f"Plot Identifier: {plot_info['plot_identifier']}")
-    print(f"Digitized on: {plot_info['created_at']}")
-    print(f"X-axis range: {plot_info['x_axis_range']}")
-    print(f"Y-axis range: {plot_info['y_axis_range']}")
-    print(f"Total data points: {len(df)}")
-    print(f"Number of sandstone datasets: {df['sandstone_name'].nunique()}")
-    
-    print("\n--- By Sandstone ---")
-    for sandstone in df['sandstone_name'].unique():
-        subset = df[df['sandstone_name'] == sandstone]
-        print(f"\n{sandstone}:")
-        print(f"  Points: {len(subset)}")
-        print(f"  P range: {subset['p_mpa'].min():.2f} - {subset['p_mpa'].max():.2f} MPa")
-        print(f"  Q range: {subset['q_mpa'].min():.2f} - {subset['q_mpa'].max():.2f} MPa")
-        print(f"  P mean: {subset['p_mpa'].mean():.2f} ± {subset['p_mpa'].std():.2f} MPa")
-        print(f"  Q mean: {subset['q_mpa'].mean():.2f} ± {subset['q_mpa'].std():.2f} MPa")
-    
-    return df.groupby('sandstone_name').agg({
-        'p_mpa': ['count', 'mean', 'std', 'min', 'max'],
-        'q_mpa': ['count', 'mean', 'std', 'min', 'max']
-    })
+    # One groupby pass feeds both the printed report and the returned table
+    stats = df.groupby('sandstone_name', sort=False, observed=True).agg(
+        point_count=('p_mpa', 'size'),
+        p_min=('p_mpa', 'min'),
+        p_max=('p_mpa', 'max'),
+        p_mean=('p_mpa', 'mean'),
+        p_std=('p_mpa', 'std'),
+        q_min=('q_mpa', 'min'),
+        q_max=('q_mpa', 'max'),
+        q_mean=('q_mpa', 'mean'),
+        q_std=('q_mpa', 'std')
+    )
+    
+    # Build the report in memory and write it to stdout in one go
+    report = io.StringIO()
+    report.write(f"\n=== SUMMARY FOR PLOT: {plot_info['doi']} Fig {plot_info['figure_number']} ===\n")
+    report.write(f"Plot Identifier: {plot_info['plot_identifier']}\n")
+    report.write(f"Digitized on: {plot_info['created_at']}\n")
+    report.write(f"X-axis range: {plot_info['x_axis_range']}\n")
+    report.write(f"Y-axis range: {plot_info['y_axis_range']}\n")
+    report.write(f"Total data points: {len(df)}\n")
+    report.write(f"Number of sandstone datasets: {len(stats)}\n")
+    
+    report.write("\n--- By Sandstone ---\n")
+    for row in stats.itertuples():
+        report.write(f"\n{row.Index}:\n")
+        report.write(f"  Points: {row.point_count}\n")
+        report.write(f"  P range: {row.p_min:.2f} - {row.p_max:.2f} MPa\n")
+        report.write(f"  Q range: {row.q_min:.2f} - {row.q_max:.2f} MPa\n")
+        report.write(f"  P mean: {row.p_mean:.2f} ± {row.p_std:.2f} MPa\n")
+        report.write(f"  Q mean: {row.q_mean:.2f} ± {row.q_std:.2f} MPa\n")
+    
+    sys.stdout.write(report.getvalue())
+    
+    return stats
 
 # ============================================================================
 # WORKFLOW VALIDATION FUNCTIONS - v1.0 (For all-sandstone validation)
@@ -282,45 +439,43 @@ def create_validation_overlay(image_pil, data_points, sandstone_names):
     Returns:
         matplotlib.figure.Figure: Figure object for Streamlit display
     """
+    import matplotlib.pyplot as plt
+    from matplotlib.colors import to_rgba
     
-    # Create figure with good size for Streamlit
-    fig, ax = plt.subplots(1, 1, figsize=(12, 8))
+    # Create figure with good size for Streamlit (constrained layout keeps the legend uncut)
+    fig, ax = plt.subplots(1, 1, figsize=(12, 8), layout='constrained')
     
     # Display original image
     ax.imshow(image_pil)
     
     # Define colors for different sandstones
-    colors = plt.cm.Set1(np.linspace(0, 1, len(sandstone_names)))
+    colors = _set1_palette(len(sandstone_names))
     color_map = {name: colors[i] for i, name in enumerate(sandstone_names)}
+    rasterized = len(data_points) > RASTERIZE_THRESHOLD
     
-    # Track which sandstones we've seen for legend
-    seen_sandstones = set()
-    
-    # Plot extracted points by sandstone
-    for point in data_points:
-        sandstone = point['dataset']
-        color = color_map.get(sandstone, 'red')
-        
-        # Only add label for first occurrence of each sandstone
-        label = sandstone if sandstone not in seen_sandstones else None
-        if label:
-            seen_sandstones.add(sandstone)
+    if data_points:
+        # Factorize once - sandstones come back in first-seen order for the legend
+        df = pd.DataFrame(data_points)
+        codes, seen_sandstones = pd.factorize(df['dataset'], sort=False)
+        seen_colors = np.array([to_rgba(color_map.get(sandstone, 'red')) for sandstone in seen_sandstones])
         
-        # Plot point with subtle cross-hair style
+        # Plot all extracted points in one call with subtle cross-hair style
         ax.scatter(
-            point['x_pixel'], 
-            point['y_pixel'],
-            color=color,
+            df['x_pixel'].to_numpy(), 
+            df['y_pixel'].to_numpy(),
+            c=seen_colors[codes],
             s=60,  # Reduced size
             alpha=0.7,  # More transparent
             marker='+',  # Cross marker
             linewidths=1.5,  # Thinner lines
-            label=label
+            rasterized=rasterized
         )
-    
-    # Add legend if we have multiple sandstones
-    if len(seen_sandstones) > 1:
-        ax.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
+        
+        # Add legend if we have multiple sandstones
+        if len(seen_sandstones) > 1:
+            ax.legend(handles=_legend_handles(seen_sandstones, seen_colors, marker='+', markersize=np.sqrt(60),
+                                              markeredgewidth=1.5, alpha=0.7),
+                      bbox_to_anchor=(1.05, 1), loc='upper left')
     
     # Styling
     ax.set_title('Validation: Extracted Points Overlay', fontsize=14, fontweight='bold')
@@ -330,9 +485,6 @@ def create_validation_overlay(image_pil, data_points, sandstone_names):
     # Add grid for reference
     ax.grid(True, alpha=0.3)
     
-    # Tight layout to prevent legend cutoff
-    plt.tight_layout()
-    
     return fig
 
 def calculate_validation_metrics(data_points, sandstone_names):
@@ -350,8 +502,9 @@ def calculate_validation_metrics(data_points, sandstone_names):
     if not data_points:
         return {}
     
-    # Convert to easier format for analysis
+    # Convert to easier format for analysis, grouping on integer category codes
     df = pd.DataFrame(data_points)
+    df['dataset'] = df['dataset'].astype('category')
     
     metrics = {}
     
@@ -373,31 +526,38 @@ def calculate_validation_metrics(data_points, sandstone_names):
         'span': df['Q(MPa)'].max() - df['Q(MPa)'].min()
     }
     
-    # Physical reasonableness checks
-    metrics['negative_p_count'] = (df['P(MPa)'] < 0).sum()
-    metrics['negative_q_count'] = (df['Q(MPa)'] < 0).sum()
+    # Physical reasonableness checks on contiguous float64 column arrays
+    p_values = np.ascontiguousarray(df['P(MPa)'].to_numpy(dtype=np.float64))
+    q_values = np.ascontiguousarray(df['Q(MPa)'].to_numpy(dtype=np.float64))
+    metrics['negative_p_count'] = int(np.count_nonzero(p_values < 0))
+    metrics['negative_q_count'] = int(np.count_nonzero(q_values < 0))
+    
+    # Q/P ratio, left as NaN where P is too small to divide by safely
+    with np.errstate(divide='ignore', invalid='ignore'):
+        q_p_ratios = np.where(p_values > 0.1, q_values / p_values, np.nan)
+    df['q_p_ratio'] = q_p_ratios
+    metrics['extreme_q_p_ratio'] = int(np.count_nonzero(q_p_ratios > 10))
+    
+    # Per-sandstone breakdown from a single groupby pass
+    by_sandstone = df.groupby('dataset', sort=False, observed=True).agg(
+        point_count=('P(MPa)', 'size'),
+        p_min=('P(MPa)', 'min'),
+        p_max=('P(MPa)', 'max'),
+        q_min=('Q(MPa)', 'min'),
+        q_max=('Q(MPa)', 'max'),
+        avg_q_p_ratio=('q_p_ratio', 'mean')
+    )
+    sandstone_stats = {row.Index: row for row in by_sandstone.itertuples()}
     
-    # Avoid division by zero for Q/P ratio
-    valid_ratios = df['P(MPa)'] > 0.1  # Avoid very small P values
-    if valid_ratios.any():
-        q_p_ratios = df.loc[valid_ratios, 'Q(MPa)'] / df.loc[valid_ratios, 'P(MPa)']
-        metrics['extreme_q_p_ratio'] = (q_p_ratios > 10).sum()
-    else:
-        metrics['extreme_q_p_ratio'] = 0
-    
-    # Per-sandstone breakdown
     metrics['by_sandstone'] = {}
     for sandstone in sandstone_names:
-        subset = df[df['dataset'] == sandstone]
-        if len(subset) > 0:
-            subset_valid_ratios = subset['P(MPa)'] > 0.1
-            avg_ratio = (subset.loc[subset_valid_ratios, 'Q(MPa)'] / subset.loc[subset_valid_ratios, 'P(MPa)']).mean() if subset_valid_ratios.any() else 0
-            
+        row = sandstone_stats.get(sandstone)
+        if row is not None:
             metrics['by_sandstone'][sandstone] = {
-                'point_count': len(subset),
-                'p_range': f"{subset['P(MPa)'].min():.1f} - {subset['P(MPa)'].max():.1f}",
-                'q_range': f"{subset['Q(MPa)'].min():.1f} - {subset['Q(MPa)'].max():.1f}",
-                'avg_q_p_ratio': avg_ratio
+                'point_count': int(row.point_count),
+                'p_range': f"{row.p_min:.1f} - {row.p_max:.1f}",
+                'q_range': f"{row.q_min:.1f} - {row.q_max:.1f}",
+                'avg_q_p_ratio': row.avg_q_p_ratio if pd.notna(row.avg_q_p_ratio) else 0
             }
     
     return metrics
@@ -481,9 +641,10 @@ def create_single_sandstone_validation_overlay(image_pil, sandstone_name, sandst
     Returns:
         matplotlib.figure.Figure: Figure object for Streamlit display
     """
+    import matplotlib.pyplot as plt
     
-    # Create figure with good size for Streamlit
-    fig, ax = plt.subplots(1, 1, figsize=(12, 8))
+    # Create figure with good size for Streamlit (constrained layout keeps the legend uncut)
+    fig, ax = plt.subplots(1, 1, figsize=(12, 8), layout='constrained')
     
     # Display original image
     ax.imshow(image_pil)
@@ -491,21 +652,22 @@ def create_single_sandstone_validation_overlay(image_pil, sandstone_name, sandst
     # Single color for this sandstone (use consistent color scheme)
     color = plt.cm.Set1(0)  # First color from Set1 colormap
     
-    # Plot extracted points for this sandstone
-    for point in sandstone_points:
+    if sandstone_points:
+        # Plot all extracted points for this sandstone in one call
+        df = pd.DataFrame(sandstone_points)
         ax.scatter(
-            point['x_pixel'], 
-            point['y_pixel'],
+            df['x_pixel'].to_numpy(), 
+            df['y_pixel'].to_numpy(),
             color=color,
             s=60,  # Reduced size
             alpha=0.7,  # More transparent
             marker='+',  # Cross marker
             linewidths=1.5,  # Thinner lines
-            label=sandstone_name if point == sandstone_points[0] else None  # Label only once
+            label=sandstone_name,
+            rasterized=len(df) > RASTERIZE_THRESHOLD
         )
-    
-    # Add legend
-    if sandstone_points:
+        
+        # Add legend
         ax.legend(loc='upper right')
     
     # Styling
@@ -517,9 +679,6 @@ def create_single_sandstone_validation_overlay(image_pil, sandstone_name, sandst
     # Add grid for reference
     ax.grid(True, alpha=0.3)
     
-    # Tight layout
-    plt.tight_layout()
-    
     return fig
 
 def calculate_single_sandstone_metrics(sandstone_name, sandstone_points):
@@ -560,18 +719,20 @@ def calculate_single_sandstone_metrics(sandstone_name, sandstone_points):
         'mean': df['Q(MPa)'].mean()
     }
     
-    # Physical reasonableness checks
-    metrics['negative_p_count'] = (df['P(MPa)'] < 0).sum()
-    metrics['negative_q_count'] = (df['Q(MPa)'] < 0).sum()
+    # Physical reasonableness checks on contiguous float64 column arrays
+    p_values = np.ascontiguousarray(df['P(MPa)'].to_numpy(dtype=np.float64))
+    q_values = np.ascontiguousarray(df['Q(MPa)'].to_numpy(dtype=np.float64))
+    metrics['negative_p_count'] = int(np.count_nonzero(p_values < 0))
+    metrics['negative_q_count'] = int(np.count_nonzero(q_values < 0))
     
     # Q/P ratio analysis (avoid division by zero)
-    valid_ratios = df['P(MPa)'] > 0.1
+    valid_ratios = p_values > 0.1
     if valid_ratios.any():
-        q_p_ratios = df.loc[valid_ratios, 'Q(MPa)'] / df.loc[valid_ratios, 'P(MPa)']
+        q_p_ratios = q_values[valid_ratios] / p_values[valid_ratios]
         metrics['q_p_ratio'] = {
             'mean': q_p_ratios.mean(),
             'max': q_p_ratios.max(),
-            'extreme_count': (q_p_ratios > 10).sum()
+            'extreme_count': int(np.count_nonzero(q_p_ratios > 10))
         }
     else:
         metrics['q_p_ratio'] = {'mean': 0, 'max': 0, 'extreme_count': 0}
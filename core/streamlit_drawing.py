@@ -4,6 +4,9 @@ from streamlit_image_coordinates import streamlit_image_coordinates
 from PIL import Image, ImageDraw
 import io
 
+# Session state slot holding the last rendered click-canvas image
+DISPLAY_IMAGE_STATE_KEY = "click_canvas_display_image"
+
 def get_point_color_selector(key_prefix):
     """
     Create a color selector for extraction points
@@ -51,6 +54,10 @@ def create_image_with_points(original_image, points, color_hex, marker_size=8):
     Returns:
         PIL Image with points drawn on it
     """
+    # Nothing to draw - the original image can be shown as is
+    if not points:
+        return original_image
+    
     # Create a copy of the original image and convert to RGBA for transparency
     img_copy = original_image.copy()
     if img_copy.mode != 'RGBA':
@@ -79,6 +86,33 @@ def create_image_with_points(original_image, points, color_hex, marker_size=8):
     
     return result
 
+def get_display_image(image, points, color_hex, key):
+    """
+    Return the image with points drawn on it, reusing the previous render
+    while the component, image, points and colour are unchanged
+    
+    Only one click canvas is shown at a time, so a single session slot holds
+    the last render - earlier canvases don't keep full-size images alive.
+    
+    Args:
+        image: PIL Image object
+        points: List of (x, y) tuples
+        color_hex: Color for the points
+        key: Unique key of the component the image is shown in
+        
+    Returns:
+        PIL Image with points drawn on it
+    """
+    signature = (key, tuple(points), color_hex)
+    
+    cached = st.session_state.get(DISPLAY_IMAGE_STATE_KEY)
+    if cached is not None and cached[0] is image and cached[1] == signature:
+        return cached[2]
+    
+    display_image = create_image_with_points(image, points, color_hex)
+    st.session_state[DISPLAY_IMAGE_STATE_KEY] = (image, signature, display_image)
+    return display_image
+
 def get_click_coordinates(image, instructions, key):
     """
     Get click coordinates using streamlit-image-coordinates with visual feedback
@@ -99,7 +133,7 @@ def get_click_coordinates(image, instructions, key):
         st.session_state[reset_key] = 0
     
     # Create image with points drawn on it
-    display_image = create_image_with_points(image, st.session_state[points_key], point_color)
+    display_image = get_display_image(image, st.session_state[points_key], point_color, key)
     
     # Display image with coordinate capture
     value = streamlit_image_coordinates(
@@ -180,7 +214,7 @@ def get_click_coordinates_simple(image, instructions, key, max_points=None):
         st.session_state[reset_key] = 0
     
     # Create image with existing points drawn on it
-    display_image = create_image_with_points(image, st.session_state[points_key], point_color)
+    display_image = get_display_image(image, st.session_state[points_key], point_color, key)
     
     # Display image with coordinate capture - use reset counter to force component refresh
     value = streamlit_image_coordinates(
@@ -1,3 +1,4 @@
+import io
 import os
 import sys
 import streamlit as st
@@ -9,9 +10,10 @@ import matplotlib.pyplot as plt
 # Add the project root to the path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from core.calibrate_axes_streamlit import calibrate_axes_streamlit
+from core.calibrate_axes_streamlit import calibrate_axes_streamlit, CALIBRATION_IMAGE_STATE_KEY
 from core.extract_points_streamlit import extract_points_streamlit
-from core.database import db_manager
+from core.database import get_db_manager
+from core.streamlit_drawing import DISPLAY_IMAGE_STATE_KEY
 from core.recreate_plot import (
     create_single_sandstone_validation_overlay, 
     aggregate_validated_sandstones_for_save,
@@ -24,6 +26,13 @@ st.set_page_config(page_title="Digitise Plots", page_icon="🔬", layout="wide")
 # Initialize custom navigation
 create_navigation()
 
+@st.cache_resource(max_entries=4, show_spinner=False)
+def load_plot_image(image_bytes):
+    """Decode an uploaded plot once - reruns get the same PIL image object back"""
+    image = Image.open(io.BytesIO(image_bytes))
+    image.load()
+    return image
+
 def init_session_state():
     """Initialize session state for per-sandstone digitization workflow"""
     defaults = {
@@ -65,7 +74,8 @@ def reset_digitization():
         "step", "current_sandstone_index", "sandstone_validation_status", 
         "extract_sub_phase", "validated_sandstones", "current_sandstone_name", 
         "current_sandstone_points", "pixel_to_data", "doi", "figure_number", 
-        "plot_identifier", "total_sandstones", "uploaded_file"
+        "plot_identifier", "total_sandstones", "uploaded_file",
+        DISPLAY_IMAGE_STATE_KEY, CALIBRATION_IMAGE_STATE_KEY
     ]
     for key in keys_to_reset:
         if key in st.session_state:
@@ -174,7 +184,7 @@ def proceed_to_next_sandstone():
             }
             
             # Save to database
-            plot_id = db_manager.save_complete_plot(plot_data)
+            plot_id = get_db_manager().save_complete_plot(plot_data)
             st.session_state.final_plot_id = plot_id
             st.session_state.step = 4  # Go to completion page
             st.cache_data.clear()
@@ -220,7 +230,7 @@ uploaded_file = st.file_uploader(
 
 if uploaded_file:
     try:
-        img_pil = Image.open(uploaded_file)
+        img_pil = load_plot_image(uploaded_file.getvalue())
         st.image(img_pil, caption="Uploaded Plot")
     except Exception as e:
         st.error(f"Error loading image: {e}")
@@ -266,10 +276,10 @@ if uploaded_file:
                 validation_messages.append("⚠️ Invalid DOI format. Please check your DOI.")
             else:
                 clean_doi = format_doi_display(doi)
-                plot_identifier = db_manager.generate_plot_identifier(clean_doi, figure_number)
+                plot_identifier = get_db_manager().generate_plot_identifier(clean_doi, figure_number)
                 
                 try:
-                    if db_manager.check_plot_exists(clean_doi, figure_number):
+                    if get_db_manager().check_plot_exists(clean_doi, figure_number):
                         validation_messages.append(f"⚠️ Plot already exists: {clean_doi} Figure {figure_number}")
                         duplicate_warning = True
                     else:
@@ -496,7 +506,11 @@ if uploaded_file:
             # Download all data as CSV - Made more prominent
             if st.session_state.validated_sandstones:
                 all_points = aggregate_validated_sandstones_for_save(st.session_state.validated_sandstones)
-                df = pd.DataFrame(all_points)
+                # Explicit columns - pandas skips inferring the layout from every dict's keys
+                df = pd.DataFrame.from_records(
+                    all_points,
+                    columns=["dataset", "x_pixel", "y_pixel", "P(MPa)", "Q(MPa)"]
+                )
                 csv = df.to_csv(index=False).encode('utf-8')
                 filename = f"{st.session_state.plot_identifier}_complete_data.csv"
                 st.download_button(
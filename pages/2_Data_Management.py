@@ -4,7 +4,7 @@ import streamlit as st
 import pandas as pd
 
 from navigation import create_navigation
-from core.database import db_manager
+from core.database import get_db_manager
 
 # Add the project root to the path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -12,12 +12,12 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 @st.cache_data(ttl=30, show_spinner="Loading plots...")
 def get_all_plots_cached():
     """Cached version of get_all_plots - refreshes every 30 seconds"""
-    return db_manager.get_all_plots()
+    return get_db_manager().get_all_plots()
 
 @st.cache_data(ttl=60)
 def get_plot_data_cached(plot_id):
     """Cached version of get_plot_data - refreshes every 60 seconds"""
-    return db_manager.get_plot_data(plot_id)
+    return get_db_manager().get_plot_data(plot_id)
 
 # Page configuration
 st.set_page_config(page_title="Data Management", page_icon="📚", layout="wide")
@@ -172,18 +172,14 @@ try:
             with col1:
                 if st.button("Export All Data as CSV", help="Download all plot data as a single CSV file"):
                     try:
-                        all_data = []
-                        for plot in plots:
-                            plot_data = get_plot_data_cached(plot['id'])
-                            if plot_data and plot_data['data_points']:
-                                for point in plot_data['data_points']:
-                                    point['doi'] = plot_data['doi']
-                                    point['figure_number'] = plot_data['figure_number']
-                                    point['plot_identifier'] = plot_data['plot_identifier']
-                                    all_data.append(point)
+                        # Stream every point in one query instead of one query per plot
+                        df_all = pd.DataFrame.from_records(
+                            get_db_manager().iter_all_data_points(),
+                            columns=['sandstone_name', 'x_pixel', 'y_pixel', 'p_mpa', 'q_mpa',
+                                     'doi', 'figure_number', 'plot_identifier']
+                        )
                         
-                        if all_data:
-                            df_all = pd.DataFrame(all_data)
+                        if not df_all.empty:
                             csv_all = df_all.to_csv(index=False).encode('utf-8')
                             st.download_button(
                                 "📥 Download All Data as CSV",
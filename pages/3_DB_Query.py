@@ -22,13 +22,13 @@ from core.query_functions import (
     get_example_nl_questions
 )
 
-from core.database import db_manager
+from core.database import get_db_manager
 from navigation import create_navigation
 
 @st.cache_data(ttl=60)
 def get_database_stats_for_query_page():
     """Cached stats for query page"""
-    return db_manager.get_database_stats()
+    return get_db_manager().get_database_stats()
 
 st.set_page_config(page_title="Database Queries", page_icon="🔍", layout="wide")
 
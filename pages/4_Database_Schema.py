@@ -55,8 +55,8 @@ erDiagram
     %% Additional Notes
     PLOTS {
         string UNIQUE_CONSTRAINT "UNIQUE(doi, figure_number)"
-        string INDEX_doi "idx_plots_doi"
-        string INDEX_identifier "idx_plots_identifier"
+        string UNIQUE_IDENTIFIER "UNIQUE(plot_identifier)"
+        string INDEX_created_at "idx_plots_created_at (created_at DESC)"
     }
     
     SANDSTONES {
@@ -67,7 +67,7 @@ erDiagram
     
     DATA_POINTS {
         string FOREIGN_KEY "FK(sandstone_id) REFERENCES sandstones(id) ON DELETE CASCADE"
-        string INDEX_sandstone_id "idx_data_points_sandstone_id"
+        string INDEX_sandstone_id "idx_data_points_sandstone_id_id (sandstone_id, id) INCLUDE (x_pixel, y_pixel, p_mpa, q_mpa)"
     }
     """
     